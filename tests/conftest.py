@@ -0,0 +1,28 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Myfraud (1).py")
+
+
+@pytest.fixture(scope="session")
+def app(tmp_path_factory):
+    # The app is one script with a space in its name, so it is loaded by path - from a scratch directory, so anything that
+    # falls back to the default calls.db or audio_blobs/ stays out of the checkout.
+    cwd = os.getcwd(); os.chdir(tmp_path_factory.mktemp("app"))
+    try:
+        spec = importlib.util.spec_from_file_location("myfraud", APP_PATH); module = importlib.util.module_from_spec(spec)
+        sys.modules["myfraud"] = module; spec.loader.exec_module(module)
+        yield module
+    finally:
+        os.chdir(cwd); sys.modules.pop("myfraud", None)
+
+
+@pytest.fixture
+def pool(app, tmp_path):
+    # A fresh database with the full schema per test
+    pool = app.make_db_pool(str(tmp_path / "test.db")); app.init_db(pool)
+    yield pool
+    app.close_db_pool(pool)
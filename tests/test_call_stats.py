@@ -0,0 +1,31 @@
+def stats_tables(app, pool):
+    conn = app.connect_db(pool)
+    try: return [conn.execute(f"SELECT * FROM {table} ORDER BY 1, 2, 3, 4").fetchall() for table in ("call_stats", "call_stats_daily")]
+    finally: conn.close()
+
+
+def test_saved_calls_update_todays_buckets(app, pool):
+    records = [{"user_email": user, "file_name": name, "audio_sha256": "e" * 64, "classification": classification, "reason": "r"}
+               for user, name, classification in [("a@example.com", "one.wav", "Fraud"), ("a@example.com", "two.WAV", "Fraud"), ("b@example.com", "three.mp3", "Normal")]]
+    assert app.save_audio_batch(records, pool=pool)
+    stats = app.fetch_call_stats(7, pool=pool)
+    assert sorted((row["file_type"], row["classification"], row["calls"]) for row in stats["file_type"]) == [("mp3", "Normal", 1), ("wav", "Fraud", 2)]
+    assert sorted((row["user_email"], row["calls"]) for row in stats["user_email"]) == [("a@example.com", 2), ("b@example.com", 1)]
+    assert [(row["classification"], row["calls"]) for row in app.fetch_call_stats(7, "b@example.com", pool=pool)["day"]] == [("Normal", 1)]
+
+
+def test_backfill_matches_incremental_maintenance(app, pool):
+    # Calls on several (back-dated) days, counted by record_call_stats as they are written, then rebuilt from calls
+    conn = app.connect_db(pool)
+    try:
+        cursor = conn.cursor()
+        for i, (day, user, name, classification) in enumerate([("2026-01-01", "a@example.com", "x.wav", "Fraud"), ("2026-01-01", "a@example.com", "y.wav", "Fraud"),
+                                                                 ("2026-01-02", "b@example.com", "z.ogg", "Spam"), ("2026-01-03", "a@example.com", "noext", "Normal")]):
+            cursor.execute("INSERT INTO calls (user_email, file_name, file_data, classification, reason, timestamp) VALUES (?, ?, X'', ?, 'r', ?)", (user, name, classification, f"{day} 12:00:{i:02d}"))
+            app.record_call_stats(cursor, user, name, classification, day=day)
+        conn.commit()
+    finally: conn.close()
+    incremental = stats_tables(app, pool)
+    assert app.backfill_call_stats(pool) == 3
+    assert stats_tables(app, pool) == incremental
+    assert incremental[1] == [("2026-01-01", "wav", "Fraud", 2), ("2026-01-02", "ogg", "Spam", 1), ("2026-01-03", app.file_type_of("noext"), "Normal", 1)]
@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+
+@pytest.fixture
+def scam_call(app):
+    # A 30 s synthetic call, and a distorted 15 s re-upload of it (different start, telephone band, noise)
+    segment = app.make_voice_like_segment(30, seed=1)
+    return app.compute_fingerprint(segment), app.compute_fingerprint(app.distort_segment(segment, np.random.default_rng(0), 15, 10.0))
+
+
+def index(app, pool, fingerprint, audio_sha256="a" * 64, **kwargs):
+    conn = app.connect_db(pool)
+    try:
+        assert app.index_fingerprint(conn.cursor(), audio_sha256, 7, "Fraud", "Asked for the OTP.", None, fingerprint, **kwargs); conn.commit()
+    finally: conn.close()
+
+
+def test_only_confirmed_tracks_match(app, pool, scam_call):
+    fingerprint, probe = scam_call
+    index(app, pool, fingerprint)
+    assert app.match_fingerprint(probe, pool) is None # Candidate: a single verdict is not served to other users
+    assert app.set_known_scam_status("confirmed", audio_sha256="a" * 64, reviewed_by="user@example.com", from_status="candidate", pool=pool) == 1
+    match = app.match_fingerprint(probe, pool)
+    assert match["call_id"] == 7 and match["classification"] == "Fraud" and match["aligned"] >= app.FINGERPRINT_MIN_ALIGNED
+
+
+def test_unrelated_call_does_not_match(app, pool, scam_call):
+    index(app, pool, scam_call[0], status="confirmed")
+    other = app.compute_fingerprint(app.make_voice_like_segment(15, seed=2))
+    assert app.match_fingerprint(other, pool) is None
+
+
+def test_removed_track_stops_matching_and_stays_removed(app, pool, scam_call):
+    fingerprint, probe = scam_call
+    index(app, pool, fingerprint, status="confirmed")
+    track_id = app.match_fingerprint(probe, pool)["track_id"]
+    assert app.set_known_scam_status("removed", track_ids=[track_id], reviewed_by="cli", pool=pool) == 1
+    assert app.match_fingerprint(probe, pool) is None
+    # Another alert for the same recording does not bring it back; neither does saving it again
+    assert app.set_known_scam_status("confirmed", audio_sha256="a" * 64, from_status="candidate", pool=pool) == 0
+    conn = app.connect_db(pool)
+    try: assert not app.index_fingerprint(conn.cursor(), "a" * 64, 8, "Fraud", "Again.", None, fingerprint)
+    finally: conn.close()
+    assert [row[1] for row in app.list_known_scams(pool=pool)] == ["removed"]
+
+
+def test_saved_scam_verdicts_are_indexed_as_candidates(app, pool, scam_call):
+    fingerprint, _ = scam_call
+    records = [{"user_email": "user@example.com", "file_name": f"call{i}.wav", "audio_sha256": sha, "classification": classification, "reason": "r", "fingerprint": fingerprint}
+               for i, (sha, classification) in enumerate([("b" * 64, "Fraud"), ("c" * 64, "Normal")])]
+    assert app.save_audio_batch(records, pool=pool)
+    assert [(row[1], row[2]) for row in app.list_known_scams(pool=pool)] == [("candidate", "Fraud")]
+
+
+def test_match_reuses_only_the_verdict(app, pool, scam_call):
+    fingerprint, probe = scam_call
+    index(app, pool, fingerprint, status="confirmed")
+    result = app.known_scam_result(app.match_fingerprint(probe, pool))
+    assert result["classification"] == "Fraud" and result["transcription"] == app.KNOWN_SCAM_TRANSCRIPTION
+    assert "OTP" not in result["reason"] and "#7" not in result["reason"] and "matched_call_id" not in result # The other user's reason and call id stay private
+
+
+def test_only_admin_alerts_confirm(app, pool, scam_call, monkeypatch):
+    monkeypatch.setattr(app, "get_db_pool", lambda: pool); monkeypatch.setattr(app, "send_email", lambda *args, **kwargs: True)
+    monkeypatch.setattr(app, "DASHBOARD_ADMIN_EMAILS", {"admin@example.com"})
+    index(app, pool, scam_call[0])
+    app.send_fraud_report("user@example.com", "Fraud", "r", "call.wav", "a" * 64)
+    assert [row[1] for row in app.list_known_scams(pool=pool)] == ["candidate"]
+    app.send_fraud_report("Admin@example.com", "Fraud", "r", "call.wav", "a" * 64)
+    assert [row[1] for row in app.list_known_scams(pool=pool)] == ["confirmed"]
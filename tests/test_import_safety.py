@@ -0,0 +1,20 @@
+import json
+import os
+import subprocess
+import sys
+
+from conftest import APP_PATH
+
+PROBE = """
+import importlib.util, json, os, sys, threading
+spec = importlib.util.spec_from_file_location("myfraud", sys.argv[1]); module = importlib.util.module_from_spec(spec); spec.loader.exec_module(module)
+print(json.dumps({"files": sorted(os.listdir(".")), "threads": sorted(thread.name for thread in threading.enumerate())}))
+"""
+
+
+def test_import_starts_nothing(tmp_path):
+    # Batch decode workers re-import the script in every process; that must not create calls.db or start the sender/metrics threads
+    output = subprocess.run([sys.executable, "-c", PROBE, APP_PATH], cwd=tmp_path, capture_output=True, text=True, check=True, env=dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path)))
+    state = json.loads(output.stdout.strip().splitlines()[-1])
+    assert state["files"] == []
+    assert not [name for name in state["threads"] if name.startswith(("email-sender", "metrics-", "analysis-job", "gemini-file-cleanup", "long-call-window"))]
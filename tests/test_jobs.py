@@ -0,0 +1,98 @@
+import json
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+
+def add_job(app, pool, status="done", batch_id=None, processed_sha256="d" * 64, processed_audio=None, classification="Normal"):
+    conn = app.connect_db(pool)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("""INSERT INTO jobs (user_email, file_name, audio_sha256, status, result_json, processed_sha256, processed_audio, fingerprint, mode, batch_id, created_at, finished_at)
+                          VALUES ('user@example.com', 'call.wav', 'upload', ?, ?, ?, ?, ?, 'single', ?, ?, ?)""",
+                       (status, json.dumps({"classification": classification, "reason": "r"}), processed_sha256, processed_audio,
+                        np.array([[1 << 20, 3], [2 << 20, 9]], dtype=np.int64).tobytes(), batch_id, time.time(), time.time()))
+        conn.commit(); return cursor.lastrowid
+    finally: conn.close()
+
+
+def job_rows(app, pool):
+    conn = app.connect_db(pool)
+    try: return conn.execute("SELECT id, saved, save_error, fingerprint IS NULL, processed_sha256 FROM jobs ORDER BY id").fetchall()
+    finally: conn.close()
+
+
+def call_count(app, pool):
+    conn = app.connect_db(pool)
+    try: return conn.execute("SELECT COUNT(*) FROM calls").fetchone()[0]
+    finally: conn.close()
+
+
+def test_batch_is_saved_once_all_jobs_finish(app, pool):
+    add_job(app, pool, batch_id="b1", classification="Fraud"); running = add_job(app, pool, status="running", batch_id="b1")
+    assert app.save_finished_jobs(batch_id="b1", pool=pool) == 0 and call_count(app, pool) == 0
+    conn = app.connect_db(pool); conn.execute("UPDATE jobs SET status='done' WHERE id=?", (running,)); conn.commit(); conn.close()
+    assert app.save_finished_jobs(batch_id="b1", pool=pool) == 2
+    assert app.save_finished_jobs(batch_id="b1", pool=pool) == 0 # Already claimed
+    assert call_count(app, pool) == 2
+    assert [row[1:4] for row in job_rows(app, pool)] == [(1, None, 1), (1, None, 1)]
+    assert [row[1] for row in app.list_known_scams(pool=pool)] == ["candidate"] # The Fraud one, from the stored fingerprint
+
+
+def test_failed_save_is_recorded_and_retried(app, pool, monkeypatch):
+    job_id = add_job(app, pool)
+    def broken(cursor, records): raise sqlite3.OperationalError("disk I/O error")
+    monkeypatch.setattr(app, "write_call_records", broken)
+    assert app.save_finished_jobs(job_id=job_id, pool=pool) == 0
+    (_, saved, save_error, _, _), = job_rows(app, pool)
+    assert (saved, save_error) == (0, "OperationalError: disk I/O error") and call_count(app, pool) == 0
+    monkeypatch.undo()
+    assert app.retry_unsaved_jobs(pool=pool) == 1
+    assert job_rows(app, pool)[0][1:3] == (1, None) and call_count(app, pool) == 1
+
+
+def test_legacy_inline_audio_is_stored_before_the_claim(app, pool, tmp_path):
+    flac_bytes = b"fLaC" + b"\0" * 64 # Taken as FLAC as-is, so no ffmpeg needed
+    job_id = add_job(app, pool, processed_sha256=None, processed_audio=flac_bytes)
+    assert app.save_finished_jobs(job_id=job_id, pool=pool, blob_dir=str(tmp_path / "blobs")) == 1
+    (_, saved, _, _, processed_sha256), = job_rows(app, pool)
+    assert saved == 1 and b"".join(app.iter_audio_blob(processed_sha256, blob_dir=str(tmp_path / "blobs"), pool=pool)) == flac_bytes
+
+
+def test_unsaved_results_survive_pruning(app, pool):
+    saved, unsaved = add_job(app, pool), add_job(app, pool)
+    conn = app.connect_db(pool); conn.execute("UPDATE jobs SET finished_at=0, saved=(id=?)", (saved,)); conn.commit(); conn.close()
+    assert app.prune_finished_jobs(pool=pool) == 1
+    assert [row[0] for row in job_rows(app, pool)] == [unsaved]
+
+
+def run_job(app, pool, monkeypatch, audio_data):
+    monkeypatch.setattr(app, "get_db_pool", lambda: pool) # _run_job uses the default pool
+    conn = app.connect_db(pool)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("INSERT INTO jobs (user_email, file_name, audio_sha256, audio_data, status, mode, created_at, started_at) VALUES ('user@example.com', 'call.wav', 'upload', ?, 'running', 'single', ?, ?)",
+                       (audio_data, time.time(), time.time()))
+        conn.commit(); job_id = cursor.lastrowid
+    finally: conn.close()
+    app._run_job({"lock": threading.Lock(), "active": 1, "wake": threading.Event()}, job_id)
+    conn = app.connect_db(pool)
+    try: return conn.execute("SELECT status, error, result_json FROM jobs WHERE id=?", (job_id,)).fetchone()
+    finally: conn.close()
+
+
+def test_unprocessable_audio_fails_with_the_reason(app, pool, monkeypatch):
+    def undecodable(*args, **kwargs): raise app.CouldntDecodeError("ffmpeg returned error code: 1\n\nInvalid data found when processing input")
+    monkeypatch.setattr(app, "decode_audio_bounded", undecodable)
+    status, error, _ = run_job(app, pool, monkeypatch, b"not audio")
+    assert status == "failed" and "'call.wav'" in error and "Invalid data found when processing input" in error
+
+
+def test_cropping_is_recorded_in_the_job_result(app, pool, monkeypatch):
+    monkeypatch.setattr(app, "decode_audio_bounded", lambda *args, **kwargs: (app.make_voice_like_segment(70, seed=1), False))
+    monkeypatch.setattr(app, "encode_payload", lambda segment, profile_name: (b"fLaC" + segment.raw_data[:64], "audio/flac", {"encode_ms": 0.0})) # No ffmpeg here
+    monkeypatch.setattr(app, "get_gemini_response", app.fake_model_response)
+    status, error, result_json = run_job(app, pool, monkeypatch, b"upload")
+    assert (status, error) == ("done", None) and json.loads(result_json)["cropped"] is True
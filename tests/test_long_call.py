@@ -0,0 +1,26 @@
+import pytest
+
+
+@pytest.mark.parametrize("duration_ms", [1, 59_999, 60_000, 60_001, 61_000, 69_999, 70_000, 110_000, 110_001, 170_000, 179_000, 1_799_999, 1_800_000])
+def test_windows_cover_the_call_with_normal_length_overlapping_windows(app, duration_ms):
+    window_ms, overlap_ms = 60_000, 10_000
+    windows = app.split_into_windows(duration_ms, window_ms, overlap_ms)
+    assert windows[0][0] == 0 and windows[-1][1] == duration_ms
+    assert all(0 < end - start <= window_ms for start, end in windows)
+    assert all(previous[1] - current[0] >= overlap_ms for previous, current in zip(windows, windows[1:]))
+    # Fewest windows that can do that: one fewer could not span the call
+    assert len(windows) == 1 or (len(windows) - 1) * (window_ms - overlap_ms) + overlap_ms < duration_ms
+
+
+def test_short_tail_gets_a_full_window(app):
+    assert app.split_into_windows(61_000, 60_000, 10_000) == [(0, 60_000), (1_000, 61_000)]
+    assert app.split_into_windows(110_000, 60_000, 10_000) == [(0, 60_000), (50_000, 110_000)]
+
+
+def test_merge_reports_most_severe_window(app):
+    windows = [{"start_ms": 0, "end_ms": 60_000, "classification": "Normal", "reason": "greeting"},
+               {"start_ms": 50_000, "end_ms": 110_000, "classification": "Fraud", "reason": "asks for the OTP"},
+               {"start_ms": 100_000, "end_ms": 160_000, "classification": "Error", "reason": "timeout"}]
+    classification, reason = app.merge_window_verdicts(windows)
+    assert classification == "Fraud"
+    assert reason.startswith("[00:50-01:50] asks for the OTP") and "1 of 3 windows could not be analyzed" in reason
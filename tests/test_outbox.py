@@ -0,0 +1,85 @@
+import smtplib
+import time
+
+
+def outbox_rows(pool, app):
+    conn = app.connect_db(pool)
+    try: return conn.execute("SELECT id, status, attempts, claimed_at, next_attempt_at, last_error FROM outbox ORDER BY id").fetchall()
+    finally: conn.close()
+
+
+def make_sender(app, pool, settings=None):
+    return app.make_email_sender(settings or {"host": "127.0.0.1", "port": 1, "use_ssl": False, "username": None, "password": None}, pool, 0, start=False)
+
+
+def test_claimed_rows_are_not_delivered_twice(app, pool, monkeypatch):
+    for i in range(3): assert app.send_email(f"subject {i}", "body", pool=pool)
+    first, second = make_sender(app, pool), make_sender(app, pool)
+    sent = []
+
+    def fake_send(sender, recipient, subject, body):
+        # While the first sender is mid-pass its rows are committed as 'sending', so a concurrent pass finds nothing due
+        assert all(row[1] == "sending" and row[3] is not None for row in outbox_rows(pool, app))
+        if sender is first: assert not app._deliver_due_emails(second)
+        sent.append((sender is first, subject)); return None
+
+    monkeypatch.setattr(app, "_smtp_send", fake_send)
+    assert app._deliver_due_emails(first)
+    assert sent == [(True, "subject 0"), (True, "subject 1"), (True, "subject 2")]
+    assert [(row[1], row[2], row[3]) for row in outbox_rows(pool, app)] == [("sent", 1, None)] * 3
+    assert not app._deliver_due_emails(first)
+
+
+def test_failed_send_is_retried_with_backoff_then_marked_failed(app, pool, monkeypatch):
+    monkeypatch.setattr(app, "EMAIL_MAX_ATTEMPTS", 2)
+    monkeypatch.setattr(app, "_smtp_send", lambda sender, recipient, subject, body: "SMTPDataError: boom")
+    app.send_email("subject", "body", pool=pool); sender = make_sender(app, pool)
+    before = time.time()
+    assert not app._deliver_due_emails(sender)
+    (_, status, attempts, claimed_at, next_attempt_at, last_error), = outbox_rows(pool, app)
+    assert (status, attempts, claimed_at, last_error) == ("pending", 1, None, "SMTPDataError: boom")
+    assert next_attempt_at >= before + app.EMAIL_RETRY_BASE_S
+    assert not app._deliver_due_emails(sender) and outbox_rows(pool, app)[0][2] == 1 # Not due yet
+    conn = app.connect_db(pool); conn.execute("UPDATE outbox SET next_attempt_at=0"); conn.commit(); conn.close()
+    app._deliver_due_emails(sender)
+    assert outbox_rows(pool, app)[0][1:3] == ("failed", 2)
+    assert sender["stats"]["retries"] == 1 and sender["stats"]["failed"] == 1
+
+
+def test_stale_claims_are_requeued(app, pool):
+    app.send_email("stuck", "body", pool=pool); app.send_email("in flight", "body", pool=pool)
+    conn = app.connect_db(pool)
+    conn.execute("UPDATE outbox SET status='sending', claimed_at=? WHERE subject='stuck'", (time.time() - app.EMAIL_CLAIM_STALE_S - 1,))
+    conn.execute("UPDATE outbox SET status='sending', claimed_at=? WHERE subject='in flight'", (time.time(),))
+    conn.commit(); conn.close()
+    sender = make_sender(app, pool) # Requeues on creation
+    assert [row[1] for row in outbox_rows(pool, app)] == ["pending", "sending"]
+    assert sender["stats"]["requeued"] == 1
+
+
+def test_smtp_delivery_reuses_connection_and_reconnects(app, pool):
+    sink = app.start_smtp_sink()
+    try:
+        sender = make_sender(app, pool, {"host": "127.0.0.1", "port": sink.server_address[1], "use_ssl": False, "username": None, "password": None})
+        for i in range(3): app.send_email(f"subject {i}", "body", pool=pool)
+        assert app._deliver_due_emails(sender)
+        assert sink.received == 3 and sender["stats"]["connections"] == 1
+        sender["smtp"] = smtplib.SMTP() # Never connected: sendmail raises SMTPServerDisconnected, which must reconnect rather than fail
+        assert app._smtp_send(sender, "to@example.com", "subject", "body") is None
+        assert sink.received == 4 and sender["stats"]["connections"] == 2
+    finally: sink.shutdown()
+
+
+def test_connection_refused_is_reported(app, pool):
+    error = app._smtp_send(make_sender(app, pool), "to@example.com", "subject", "body")
+    assert error is not None and "Refused" in error
+
+
+def test_refused_recipient_keeps_the_connection(app, pool):
+    # SMTPRecipientsRefused is an OSError too; it must not be treated as a dropped connection
+    class RefusingServer:
+        calls = 0
+        def sendmail(self, *args): RefusingServer.calls += 1; raise smtplib.SMTPRecipientsRefused({"to@example.com": (550, b"no such user")})
+    sender = make_sender(app, pool); server = sender["smtp"] = RefusingServer()
+    error = app._smtp_send(sender, "to@example.com", "subject", "body")
+    assert error.startswith("SMTPRecipientsRefused") and sender["smtp"] is server and RefusingServer.calls == 1
@@ -0,0 +1,34 @@
+import threading
+import time
+
+
+def test_backoff_pauses_every_caller(app):
+    limiter = app.make_model_rate_limiter(max_concurrency=4, requests_per_minute=6000)
+    app.back_off_model_calls(0.3, limiter)
+    start = time.monotonic()
+    with app.model_call_slot(limiter): waited = time.monotonic() - start
+    assert waited >= 0.3
+    # The bucket was emptied and does not refill during the pause, so callers resume at the normal rate rather than as a burst
+    assert limiter["tokens"] < 1
+
+
+def test_token_bucket_paces_requests(app):
+    limiter = app.make_model_rate_limiter(max_concurrency=2, requests_per_minute=600) # 10/s after a burst of 2
+    start = time.monotonic()
+    for _ in range(5):
+        with app.model_call_slot(limiter): pass
+    assert 0.25 <= time.monotonic() - start < 1.0
+
+
+def test_concurrency_cap(app):
+    limiter = app.make_model_rate_limiter(max_concurrency=2, requests_per_minute=60000)
+    active, peak, lock = [0], [0], threading.Lock()
+    def call():
+        with app.model_call_slot(limiter):
+            with lock: active[0] += 1; peak[0] = max(peak[0], active[0])
+            time.sleep(0.1)
+            with lock: active[0] -= 1
+    threads = [threading.Thread(target=call) for _ in range(6)]
+    for thread in threads: thread.start()
+    for thread in threads: thread.join()
+    assert peak[0] == 2
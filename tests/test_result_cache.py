@@ -0,0 +1,19 @@
+import re
+
+
+def exported(app):
+    text = app.render_prometheus_metrics()
+    return {event: int(value) for event, value in re.findall(r'fraudshield_result_cache_events_total\{event="(\w+)"\} (\d+)', text)}
+
+
+def test_cache_counters_reach_metrics_and_db_summary(app, pool, monkeypatch):
+    monkeypatch.setattr(app, "get_db_pool", lambda: pool) # cache_get/cache_put use the default pool
+    before = exported(app)
+    key = app.make_cache_key("prompt", b"audio"); app.cache_put(key, "Classification: Normal")
+    assert app.cache_get(key) == "Classification: Normal" and app.cache_get(app.make_cache_key("prompt", b"other")) is None
+    with app.get_result_cache_memory()["lock"]: app.get_result_cache_memory()["entries"].pop(key) # Force the next lookup to the DB tier
+    assert app.cache_get(key) == "Classification: Normal"
+    after = exported(app)
+    assert {event: after[event] - before.get(event, 0) for event in after} == {"memory_hits": 1, "db_hits": 1, "misses": 1, "stores": 1, "evictions": 0}
+    summary = app.summarize_result_cache(pool)
+    assert (summary["entries"], summary["reused_entries"], summary["db_hits"]) == (1, 1, 1)
@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+
+def segment_from(app, samples, sample_rate=16000):
+    return app.AudioSegment(data=np.clip(samples, -32768, 32767).astype(np.int16).tobytes(), sample_width=2, frame_rate=sample_rate, channels=1)
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+@pytest.mark.parametrize("snr_db", [30, 20, 10])
+def test_noisy_speech_is_speech(app, seed, snr_db):
+    segment = app.distort_segment(app.make_voice_like_segment(20, seed), np.random.default_rng(seed), 20, snr_db)
+    assert app.analyze_voice_activity(segment)["has_speech"]
+
+
+@pytest.mark.parametrize("gain_db", [0, -10, -20, -30])
+def test_quiet_speech_is_speech(app, gain_db):
+    assert app.analyze_voice_activity(app.make_voice_like_segment(20, 3).apply_gain(gain_db))["has_speech"]
+
+
+def tone(seconds, freq=400, level=0.1, sample_rate=16000):
+    return level * 32767 * np.sin(2 * np.pi * freq * np.arange(int(seconds * sample_rate)) / sample_rate)
+
+
+@pytest.mark.parametrize("name", ["silence", "noise", "hum", "hum_in_noise", "ringback"])
+def test_non_speech_is_gated(app, name):
+    rng = np.random.default_rng(0)
+    samples = {"silence": np.zeros(160000), "noise": rng.normal(0, 3000, 160000), "hum": tone(10, freq=50), "hum_in_noise": tone(10) + rng.normal(0, 300, 160000),
+               "ringback": np.concatenate([np.concatenate([tone(2), np.zeros(64000)]) for _ in range(3)])}[name]
+    vad = app.analyze_voice_activity(segment_from(app, samples))
+    assert not vad["has_speech"] and vad["modulation_db"] < app.VAD_MIN_MODULATION_DB